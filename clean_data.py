@@ -2,38 +2,45 @@
 import pandas as pd
 import numpy as np
 
-def clean_data(input_path: str = "dataset.csv", output_path: str = "cleaned_dataset.csv") -> Path:
+from instrumentation import StageMetrics, instrumented_stage, DIAGNOSTIC
+
+DEDUP_KEYS = ["Invoice", "StockCode", "InvoiceDate", "Quantity", "Price"]
+
+
+def row_hash(df: pd.DataFrame, columns=None) -> np.ndarray:
     """
-    Load dataset, apply cleaning rules, and perform EDA checks:
-    - Missing value analysis (per kolom & total)
-    - Duplicate check
-    - Negative quantity (returns)
-    - Price & Quantity outliers (IQR method)
-    - Abnormal invoice date detection
+    Hash 64-bit per baris untuk tuple kolom `columns` (default: semua kolom).
+    Membandingkan uint64 jauh lebih murah daripada df.duplicated() pada
+    kolom string/datetime. Peluang tabrakan hash ~n²/2^65, dapat diabaikan.
     """
-    input_path = Path(input_path)
-    output_path = Path(output_path)
-
-    df = pd.read_csv(
-        input_path,
-        dtype={"Invoice": str, "StockCode": str},
-        low_memory=False,
-    )
+    if columns is not None:
+        df = df[columns]
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
 
-    # ========== EDA BEFORE CLEANING ==========
-    print("===== EDA AWAL (SEBELUM CLEANING) =====")
 
+def _eda_checks(df: pd.DataFrame, metrics: StageMetrics, tahap: str, count_duplicates: bool = True):
+    """
+    Laporan EDA (hanya dijalankan pada verbosity DIAGNOSTIC). Nilai yang
+    dihitung juga dicatat ke metrics dengan prefix `tahap`.
+    """
     # 1. Missing value
-    print("\n▶ Missing Value per Kolom:")
-    print(df.isnull().sum())
-    print(f"\n▶ TOTAL Missing Value: {df.isnull().sum().sum()}")
-
-    # 2. Duplikasi
-    print(f"\n▶ Jumlah Duplikasi Baris: {df.duplicated().sum()}")
+    missing = df.isnull().sum()
+    metrics.log("\n▶ Missing Value per Kolom:", level=DIAGNOSTIC)
+    metrics.log(missing, level=DIAGNOSTIC)
+    metrics.log(f"\n▶ TOTAL Missing Value: {missing.sum()}", level=DIAGNOSTIC)
+    metrics.set(f"{tahap}_missing_total", missing.sum())
+
+    # 2. Duplikasi — setelah dedup key (subset semua kolom) duplikasi baris
+    # penuh sudah pasti 0, jadi tidak perlu dihitung ulang
+    n_duplicates = pd.Series(row_hash(df)).duplicated().sum() if count_duplicates else 0
+    metrics.log(f"\n▶ Jumlah Duplikasi Baris: {n_duplicates}", level=DIAGNOSTIC)
+    metrics.set(f"{tahap}_duplicate_rows", n_duplicates)
 
     # 3. Transaksi dengan Quantity negatif
     if "Quantity" in df.columns:
-        print(f"\n▶ Jumlah Quantity Negatif (return): {(df['Quantity'] < 0).sum()}")
+        negative_qty = (df["Quantity"] < 0).sum()
+        metrics.log(f"\n▶ Jumlah Quantity Negatif (return): {negative_qty}", level=DIAGNOSTIC)
+        metrics.set(f"{tahap}_negative_quantity", negative_qty)
 
     # 4. Outlier Harga (IQR)
     if "Price" in df.columns:
@@ -41,7 +48,8 @@ def clean_data(input_path: str = "dataset.csv", output_path: str = "cleaned_data
         Q3_p = df["Price"].quantile(0.75)
         IQR_p = Q3_p - Q1_p
         outliers_price = ((df["Price"] < (Q1_p - 1.5 * IQR_p)) | (df["Price"] > (Q3_p + 1.5 * IQR_p))).sum()
-        print(f"\n▶ Jumlah Outlier Harga: {outliers_price}")
+        metrics.log(f"\n▶ Jumlah Outlier Harga: {outliers_price}", level=DIAGNOSTIC)
+        metrics.set(f"{tahap}_price_outliers", outliers_price)
 
     # 5. Outlier Quantity (IQR)
     if "Quantity" in df.columns:
@@ -49,82 +57,100 @@ def clean_data(input_path: str = "dataset.csv", output_path: str = "cleaned_data
         Q3_q = df["Quantity"].quantile(0.75)
         IQR_q = Q3_q - Q1_q
         outliers_qty = ((df["Quantity"] < (Q1_q - 1.5 * IQR_q)) | (df["Quantity"] > (Q3_q + 1.5 * IQR_q))).sum()
-        print(f"\n▶ Jumlah Outlier Quantity (IQR): {outliers_qty}")
+        metrics.log(f"\n▶ Jumlah Outlier Quantity (IQR): {outliers_qty}", level=DIAGNOSTIC)
+        metrics.set(f"{tahap}_quantity_outliers", outliers_qty)
 
     # 6. Invoice Date aneh
     if "InvoiceDate" in df.columns:
-        df["InvoiceDate"] = pd.to_datetime(df["InvoiceDate"], errors="coerce")
-        abnormal_date_count = ((df["InvoiceDate"] < "1900-01-01") | (df["InvoiceDate"] > pd.Timestamp.now())).sum()
-        print(f"\n▶ Jumlah Invoice dengan Tanggal Aneh: {abnormal_date_count}")
+        invoice_date = pd.to_datetime(df["InvoiceDate"], errors="coerce")
+        abnormal_date_count = ((invoice_date < "1900-01-01") | (invoice_date > pd.Timestamp.now())).sum()
+        metrics.log(f"\n▶ Jumlah Invoice dengan Tanggal Aneh: {abnormal_date_count}", level=DIAGNOSTIC)
+        metrics.set(f"{tahap}_abnormal_dates", abnormal_date_count)
 
-    # ========== DATA CLEANING ==========
-    df.columns = [c.strip().replace(" ", "_") for c in df.columns]
-    df = df.dropna(subset=["Invoice", "StockCode", "Quantity", "Price"])
-    df["Invoice"] = df["Invoice"].astype(str).str.strip()
-    df["StockCode"] = df["StockCode"].astype(str).str.strip()
-    df = df[~df["Invoice"].str.startswith("C")]
-
-    df["Quantity"] = pd.to_numeric(df["Quantity"], errors="coerce")
-    df["Price"] = pd.to_numeric(df["Price"], errors="coerce")
-    df = df.dropna(subset=["Quantity", "Price"])
-    df = df[(df["Quantity"] > 0) & (df["Price"] > 0)]
 
-    df["InvoiceDate"] = pd.to_datetime(df["InvoiceDate"], errors="coerce")
-    df = df.dropna(subset=["InvoiceDate"])
+@instrumented_stage("clean_data")
+def clean_data(input_path: str = "dataset.csv", output_path: str = "cleaned_dataset.csv",
+               sort_output: bool = True, metrics: StageMetrics = None) -> Path:
+    """
+    Load dataset, apply cleaning rules, and perform EDA checks:
+    - Missing value analysis (per kolom & total)
+    - Duplicate check
+    - Negative quantity (returns)
+    - Price & Quantity outliers (IQR method)
+    - Abnormal invoice date detection
 
-    if "Description" in df.columns:
-        df["Description"] = df["Description"].astype(str).str.strip()
-        df = df[df["Description"] != ""]
+    Duplikasi dihitung dan dibuang lewat hash 64-bit per baris (lihat
+    row_hash). Jika tahap berikutnya tidak butuh urutan, sort_output=False
+    melewati sort global.
 
-    if "Customer_ID" in df.columns:
-        df = df.dropna(subset=["Customer_ID"])
+    Jumlah baris per filter dan waktu per operasi dicatat di `metrics`;
+    pengecekan EDA hanya dijalankan pada verbosity DIAGNOSTIC.
+    """
+    input_path = Path(input_path)
+    output_path = Path(output_path)
 
-    dedup_keys = ["Invoice", "StockCode", "InvoiceDate", "Quantity", "Price"]
-    existing_keys = [k for k in dedup_keys if k in df.columns]
-    df = df.drop_duplicates(subset=existing_keys)
+    with metrics.operation("read_csv"):
+        df = pd.read_csv(
+            input_path,
+            dtype={"Invoice": str, "StockCode": str},
+            low_memory=False,
+        )
+    metrics.set("rows_input", len(df))
 
-    df = df.sort_values(by=["Invoice", "StockCode", "InvoiceDate"]).reset_index(drop=True)
+    # ========== EDA BEFORE CLEANING ==========
+    if metrics.diagnostics:
+        metrics.log("===== EDA AWAL (SEBELUM CLEANING) =====", level=DIAGNOSTIC)
+        with metrics.operation("eda_before"):
+            _eda_checks(df, metrics, "before")
 
-    # ========== EDA SETELAH CLEANING ==========
-    print("\n===== EDA SETELAH CLEANING =====")
+    # ========== DATA CLEANING ==========
+    with metrics.operation("cleaning"):
+        df.columns = [c.strip().replace(" ", "_") for c in df.columns]
+        df = metrics.filter("dropna_required", df, df.dropna(subset=["Invoice", "StockCode", "Quantity", "Price"]))
+        df["Invoice"] = df["Invoice"].astype(str).str.strip()
+        df["StockCode"] = df["StockCode"].astype(str).str.strip()
+        df = metrics.filter("cancelled_invoice", df, df[~df["Invoice"].str.startswith("C")])
+
+        df["Quantity"] = pd.to_numeric(df["Quantity"], errors="coerce")
+        df["Price"] = pd.to_numeric(df["Price"], errors="coerce")
+        df = metrics.filter("non_numeric", df, df.dropna(subset=["Quantity", "Price"]))
+        df = metrics.filter("non_positive", df, df[(df["Quantity"] > 0) & (df["Price"] > 0)])
 
-    # 1. Missing value
-    print("\n▶ Missing Value per Kolom:")
-    print(df.isnull().sum())
-    print(f"\n▶ TOTAL Missing Value: {df.isnull().sum().sum()}")
+        df["InvoiceDate"] = pd.to_datetime(df["InvoiceDate"], errors="coerce")
+        df = metrics.filter("invalid_date", df, df.dropna(subset=["InvoiceDate"]))
 
-    # 2. Duplikasi
-    print(f"\n▶ Jumlah Duplikasi Baris: {df.duplicated().sum()}")
+        if "Description" in df.columns:
+            df["Description"] = df["Description"].astype(str).str.strip()
+            df = metrics.filter("empty_description", df, df[df["Description"] != ""])
 
-    # 3. Transaksi dengan Quantity negatif
-    if "Quantity" in df.columns:
-        print(f"\n▶ Jumlah Quantity Negatif (return): {(df['Quantity'] < 0).sum()}")
+        if "Customer_ID" in df.columns:
+            df = metrics.filter("missing_customer", df, df.dropna(subset=["Customer_ID"]))
 
-    # 4. Outlier Harga (IQR)
-    if "Price" in df.columns:
-        Q1_p = df["Price"].quantile(0.25)
-        Q3_p = df["Price"].quantile(0.75)
-        IQR_p = Q3_p - Q1_p
-        outliers_price = ((df["Price"] < (Q1_p - 1.5 * IQR_p)) | (df["Price"] > (Q3_p + 1.5 * IQR_p))).sum()
-        print(f"\n▶ Jumlah Outlier Harga: {outliers_price}")
+    # Hash key dihitung sekali: dipakai untuk hitung sekaligus buang duplikasi
+    with metrics.operation("deduplicate"):
+        existing_keys = [k for k in DEDUP_KEYS if k in df.columns]
+        dup_mask = pd.Series(row_hash(df, existing_keys)).duplicated().to_numpy()
+        df = metrics.filter("duplicates", df, df[~dup_mask])
+    metrics.log(f"\n▶ Duplikasi dibuang (key {existing_keys}): {dup_mask.sum()}")
 
-    # 5. Outlier Quantity (IQR)
-    if "Quantity" in df.columns:
-        Q1_q = df["Quantity"].quantile(0.25)
-        Q3_q = df["Quantity"].quantile(0.75)
-        IQR_q = Q3_q - Q1_q
-        outliers_qty = ((df["Quantity"] < (Q1_q - 1.5 * IQR_q)) | (df["Quantity"] > (Q3_q + 1.5 * IQR_q))).sum()
-        print(f"\n▶ Jumlah Outlier Quantity (IQR): {outliers_qty}")
+    if sort_output:
+        with metrics.operation("sort"):
+            df = df.sort_values(by=["Invoice", "StockCode", "InvoiceDate"])
+    df = df.reset_index(drop=True)
+    metrics.set("rows_output", len(df))
 
-    # 6. Invoice Date aneh
-    if "InvoiceDate" in df.columns:
-        abnormal_date_count = ((df["InvoiceDate"] < "1900-01-01") | (df["InvoiceDate"] > pd.Timestamp.now())).sum()
-        print(f"\n▶ Jumlah Invoice dengan Tanggal Aneh: {abnormal_date_count}")
+    # ========== EDA SETELAH CLEANING ==========
+    if metrics.diagnostics:
+        metrics.log("\n===== EDA SETELAH CLEANING =====", level=DIAGNOSTIC)
+        with metrics.operation("eda_after"):
+            _eda_checks(df, metrics, "after", count_duplicates=False)
 
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(output_path, index=False)
+    with metrics.operation("write_csv"):
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        df.to_csv(output_path, index=False)
 
-    print("\n✔ Cleaning selesai. Data disimpan ke:", output_path)
+    metrics.log(f"\n▶ Baris: {metrics.values['rows_input']} → {len(df)}")
+    metrics.log("\n✔ Cleaning selesai. Data disimpan ke:", output_path)
     return output_path
 
 
@@ -9,27 +9,61 @@ from clean_data import clean_data
 from exploration import explore_clean_data
 from feature_rfm import feature_engineering
 from eda_feature_engineering import eda_feature_engineering
+from segmentation_engines import make_engine
+from coreset import build_coreset, weighted_silhouette
 
 # =====================================================
 # METODE ELBOW + SILHOUETTE
 # =====================================================
-def determine_optimal_clusters(fitur_normalized):
-    print("\n===== MENENTUKAN JUMLAH CLUSTER (Elbow & Silhouette) =====\n")
+def determine_optimal_clusters(fitur_normalized, engine: str = "kmeans", use_coreset: bool = False,
+                               coreset_size: int = 2000, coreset_method: str = "sensitivity",
+                               validate_full: bool = False):
+    """
+    Sweep K = 2..8 (Elbow + Silhouette) dan pilih K dengan silhouette terbaik.
+
+    use_coreset=True: sweep dijalankan pada coreset berbobot berukuran
+    `coreset_size` (K-Means berbobot + silhouette berbobot), sehingga biaya
+    sweep hampir konstan terhadap jumlah customer. validate_full=True
+    mengecek K terpilih sekali lagi di data penuh (silhouette pada sampel
+    maksimal 5000 customer). Mode coreset hanya untuk
+    engine "kmeans" (engine lain tidak mendukung bobot sampel).
+    """
+    print(f"\n===== MENENTUKAN JUMLAH CLUSTER (Elbow & Silhouette, engine = {engine}) =====\n")
 
     inertia_values = []     # Untuk Elbow Method
     silhouette_values = []  # Untuk Silhouette Score
     K_range = range(2, 9)   # Coba cluster dari 2 hingga 8 (umumnya 3–5 ideal)
 
-    for k in K_range:
-        kmeans = KMeans(n_clusters=k, random_state=42)
-        kmeans.fit(fitur_normalized)
-        inertia_values.append(kmeans.inertia_)
+    if use_coreset:
+        if engine != "kmeans":
+            raise ValueError(f"❌ Mode coreset hanya mendukung engine 'kmeans', bukan '{engine}'")
+
+        points, weights, _ = build_coreset(
+            fitur_normalized, coreset_size, method=coreset_method, n_seeds=max(K_range)
+        )
+        print(f"▶ Sweep pada coreset: {len(points)} customer unik berbobot "
+              f"(mewakili {len(fitur_normalized)} customer)\n")
+
+        for k in K_range:
+            kmeans = KMeans(n_clusters=k, random_state=42)
+            kmeans.fit(points, sample_weight=weights)
+            inertia_values.append(kmeans.inertia_)
+
+            score = weighted_silhouette(points, kmeans.labels_, weights)
+            silhouette_values.append(score)
 
-        # Hitung silhouette hanya jika cluster >=2
-        score = silhouette_score(fitur_normalized, kmeans.labels_)
-        silhouette_values.append(score)
+            print(f"K = {k} → Inertia (estimasi) = {kmeans.inertia_:.2f}, Silhouette (estimasi) = {score:.4f}")
+    else:
+        for k in K_range:
+            model = make_engine(engine, n_clusters=k)
+            model.fit(fitur_normalized)
+            inertia_values.append(model.inertia_)
 
-        print(f"K = {k} → Inertia = {kmeans.inertia_:.2f}, Silhouette = {score:.4f}")
+            # Hitung silhouette hanya jika cluster >=2
+            score = silhouette_score(fitur_normalized, model.labels_)
+            silhouette_values.append(score)
+
+            print(f"K = {k} → Inertia = {model.inertia_:.2f}, Silhouette = {score:.4f}")
 
     # ==== 1. Plot Elbow Method ====
     plt.figure(figsize=(6, 4))
@@ -52,6 +86,16 @@ def determine_optimal_clusters(fitur_normalized):
     optimal_k = K_range[silhouette_values.index(max(silhouette_values))]
     print(f"\n🎯 Jumlah cluster optimal berdasarkan Silhouette Score = **{optimal_k}**")
 
+    if use_coreset and validate_full:
+        kmeans = KMeans(n_clusters=optimal_k, random_state=42)
+        kmeans.fit(fitur_normalized)
+        full_score = silhouette_score(
+            fitur_normalized, kmeans.labels_, sample_size=min(len(fitur_normalized), 5000), random_state=42
+        )
+        coreset_score = silhouette_values[K_range.index(optimal_k)]
+        print(f"\n✅ Validasi data penuh K = {optimal_k}: Inertia = {kmeans.inertia_:.2f}, "
+              f"Silhouette = {full_score:.4f} (estimasi coreset {coreset_score:.4f})")
+
     return optimal_k
 
 # =====================================================
@@ -61,7 +105,7 @@ if __name__ == "__main__":
     print("\n🚀 Menjalankan CLUSTERING ANALYSIS...\n")
 
     # 1. Cleaning data
-    output_file = clean_data()
+    output_file = clean_data(sort_output=False)
     df_clean = pd.read_csv(output_file, parse_dates=["InvoiceDate"])
 
     # 2. Eksplorasi awal
@@ -1,8 +1,8 @@
+import sys
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
-from sklearn.cluster import KMeans
 from scipy.spatial.distance import cdist
 from sklearn.decomposition import PCA  # 🔥 Tambahan untuk PCA
 
@@ -13,15 +13,16 @@ from feature_rfm import feature_engineering
 from eda_feature_engineering import eda_feature_engineering
 from normalize_feature import normalize_features
 from clustering import determine_optimal_clusters
+from segmentation_engines import make_engine, compare_engines, recommend_engine
 
 # =====================================================
 # FINAL CLUSTERING K-MEANS
 # =====================================================
-def final_kmeans_clustering(fitur_normalized, optimal_k, fitur_customer, df_clean):
-    print(f"\n===== 🚀 MEMBUAT MODEL K-MEANS DENGAN K = {optimal_k} =====\n")
+def final_kmeans_clustering(fitur_normalized, optimal_k, fitur_customer, df_clean, engine: str = "kmeans"):
+    print(f"\n===== 🚀 MEMBUAT MODEL {engine.upper()} DENGAN K = {optimal_k} =====\n")
 
-    # 1. Buat model dan fit
-    kmeans = KMeans(n_clusters=optimal_k, random_state=42)
+    # 1. Buat model dan fit (lihat segmentation_engines.ENGINES)
+    kmeans = make_engine(engine, n_clusters=optimal_k)
     cluster_labels = kmeans.fit_predict(fitur_normalized)
 
     # 2. Tambahkan ke dataset
@@ -74,8 +75,12 @@ def final_kmeans_clustering(fitur_normalized, optimal_k, fitur_customer, df_clea
     pca = PCA(n_components=2)
     fitur_pca = pca.fit_transform(fitur_normalized)
 
-    # Proyeksikan centroid ke PCA space
+    # Proyeksikan centroid ke PCA space (komponen kosong → centroid NaN, dilewati)
     centroids = kmeans.cluster_centers_
+    cluster_ids = np.flatnonzero(~np.isnan(centroids).any(axis=1))
+    if len(cluster_ids) < len(centroids):
+        print(f"\n⚠ {len(centroids) - len(cluster_ids)} cluster kosong, tidak ditampilkan.")
+    centroids = centroids[cluster_ids]
     centroid_pca = pca.transform(centroids)
 
     print("\n📌 Variance explained oleh PCA:")
@@ -110,8 +115,8 @@ def final_kmeans_clustering(fitur_normalized, optimal_k, fitur_customer, df_clea
     print("\n📏 MATRIX JARAK ANTAR CENTROID:")
     print(pd.DataFrame(
         centroid_distances,
-        index=[f"Cluster {i}" for i in range(optimal_k)],
-        columns=[f"Cluster {i}" for i in range(optimal_k)]
+        index=[f"Cluster {i}" for i in cluster_ids],
+        columns=[f"Cluster {i}" for i in cluster_ids]
     ))
 
     return fitur_customer, kmeans
@@ -124,7 +129,7 @@ if __name__ == "__main__":
     print("\n🚀 FINAL CLUSTERING ANALYSIS...\n")
 
     # 1. Cleaning data
-    output_file = clean_data()
+    output_file = clean_data(sort_output=False)
     df_clean = pd.read_csv(output_file, parse_dates=["InvoiceDate"])
 
     # 2. Explorasi data
@@ -147,11 +152,19 @@ if __name__ == "__main__":
     # 6. Tentukan jumlah cluster
     optimal_k = determine_optimal_clusters(fitur_normalized)
 
-    # 7. Clustering final
+    # 7. (Opsional, --compare-engines) bandingkan engine segmentasi;
+    #    default tetap K-Means
+    engine = "kmeans"
+    if "--compare-engines" in sys.argv:
+        engine_report = compare_engines(fitur_normalized, optimal_k)
+        engine = recommend_engine(engine_report)
+        print(f"\n🏁 Engine terpilih: {engine}")
+
+    # 8. Clustering final
     fitur_hasil_cluster, model_kmeans = final_kmeans_clustering(
-        fitur_normalized, optimal_k, fitur_customer, df_clean
+        fitur_normalized, optimal_k, fitur_customer, df_clean, engine=engine
     )
 
-    # 8. Simpan hasil
+    # 9. Simpan hasil
     fitur_hasil_cluster.to_csv("customer_cluster_result.csv", index=True)
     print("\n📁 Hasil clustering disimpan ke: customer_cluster_result.csv")
@@ -0,0 +1,107 @@
+import numpy as np
+from scipy.spatial.distance import cdist
+from sklearn.cluster import kmeans_plusplus
+
+
+# =====================================================
+# CORESET BERBOBOT
+# =====================================================
+def build_coreset(X, size: int = 2000, random_state: int = 42, method: str = "lightweight", n_seeds: int = 8):
+    """
+    Ambil coreset berbobot dari data (array / DataFrame fitur normalisasi).
+
+    - method="lightweight" (Bachem et al. 2018): q(x) = 1/(2n) + d(x, mean)² / (2 Σ d²),
+      satu pass atas data.
+    - method="sensitivity" (Bachem et al. 2017, "Practical Coreset Constructions"):
+      seeding k-means++ dengan `n_seeds` pusat B, c_φ = Σ d(x, B)² / n, α = 16(log n_seeds + 2),
+      s(x) = α·d(x, B)²/c_φ + 2α·Σ_{x'∈B_x} d(x', B)² / (|B_x|·c_φ) + 4n/|B_x|,
+      q(x) ∝ s(x). Lebih akurat untuk K kecil-menengah, biaya O(n · n_seeds).
+
+    Customer ekstrem (mis. big spender) tetap terwakili. Bobot 1/(size·q)
+    membuat jumlah bobot ≈ n, jadi inertia berbobot di coreset mendekati
+    inertia di data penuh.
+
+    Sampling dilakukan dengan pengembalian; indeks yang terambil lebih dari
+    sekali digabung (bobotnya dijumlahkan), jadi ukuran coreset bisa < size.
+
+    Return: (titik coreset unik, bobot, indeks baris asal)
+    """
+    X = np.asarray(X, dtype=float)
+    n = len(X)
+    if n <= size:
+        return X, np.ones(n), np.arange(n)
+
+    rng = np.random.default_rng(random_state)
+    if method == "lightweight":
+        dist_sq = ((X - X.mean(axis=0)) ** 2).sum(axis=1)
+        q = 0.5 / n + 0.5 * dist_sq / dist_sq.sum()
+    elif method == "sensitivity":
+        seeds, _ = kmeans_plusplus(X, n_clusters=n_seeds, random_state=random_state)
+        dist_sq = cdist(X, seeds, "sqeuclidean")
+        nearest = dist_sq.argmin(axis=1)
+        dist_min = dist_sq[np.arange(n), nearest]
+        cluster_size = np.bincount(nearest, minlength=n_seeds)
+
+        sensitivity = 4.0 * n / cluster_size[nearest]
+        c_phi = dist_min.sum() / n
+        if c_phi > 0:
+            alpha = 16 * (np.log(n_seeds) + 2)
+            cluster_cost = np.bincount(nearest, weights=dist_min, minlength=n_seeds)
+            sensitivity = (
+                sensitivity
+                + alpha * dist_min / c_phi
+                + 2 * alpha * cluster_cost[nearest] / (cluster_size[nearest] * c_phi)
+            )
+        q = sensitivity / sensitivity.sum()
+    else:
+        raise ValueError(f"❌ Metode coreset tidak dikenal: {method} (pilih 'lightweight' atau 'sensitivity')")
+
+    idx = rng.choice(n, size=size, replace=True, p=q)
+    weights = 1.0 / (size * q[idx])
+
+    # Gabungkan duplikat: satu titik unik dengan bobot total
+    idx, inverse = np.unique(idx, return_inverse=True)
+    weights = np.bincount(inverse, weights=weights)
+    return X[idx], weights, idx
+
+
+# =====================================================
+# SILHOUETTE BERBOBOT
+# =====================================================
+def weighted_silhouette(X, labels, weights) -> float:
+    """
+    Silhouette score di mana setiap titik mewakili `weights` customer:
+    jarak rata-rata intra/antar cluster dihitung berbobot, lalu skor per
+    titik dirata-ratakan berbobot. Biaya O(m²) untuk m titik coreset.
+    """
+    X = np.asarray(X, dtype=float)
+    labels = np.asarray(labels)
+    weights = np.asarray(weights, dtype=float)
+
+    clusters = np.unique(labels)
+    if len(clusters) < 2:
+        return float("nan")
+
+    rows = np.arange(len(X))
+    own = np.searchsorted(clusters, labels)
+    membership = np.zeros((len(X), len(clusters)))
+    membership[rows, own] = weights
+
+    # dist_sum[i, c] = Σ_{j ∈ c} w_j · d(i, j)
+    dist_sum = cdist(X, X) @ membership
+    mass = membership.sum(axis=0)
+
+    own_mass = mass[own] - weights  # tanpa titik itu sendiri
+    a = dist_sum[rows, own] / np.where(own_mass > 0, own_mass, 1.0)
+    # Titik sendirian di cluster-nya tapi berbobot > 1 mewakili banyak customer
+    # identik → jarak intra-cluster 0 (s = 1), bukan konvensi s = 0
+    alone = own_mass <= 0
+    a[alone] = 0.0
+
+    other = dist_sum / mass
+    other[rows, own] = np.inf
+    b = other.min(axis=1)
+
+    s = (b - a) / np.maximum(a, b)
+    s[alone & (weights <= 1)] = 0.0  # konvensi silhouette untuk cluster satu customer
+    return float(np.average(np.nan_to_num(s), weights=weights))
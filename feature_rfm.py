@@ -4,44 +4,51 @@ import seaborn as sns
 from datetime import datetime
 from clean_data import clean_data
 from exploration import explore_clean_data
+from instrumentation import StageMetrics, instrumented_stage, DIAGNOSTIC
 
 
 # ==============================================
 # FEATURE ENGINEERING (RFM)
 # ==============================================
-def feature_engineering(df: pd.DataFrame):
+@instrumented_stage("feature_engineering")
+def feature_engineering(df: pd.DataFrame, metrics: StageMetrics = None):
     df = df.copy()  # hindari warning
-    print("\n===== FEATURE ENGINEERING PER CUSTOMER =====")
+    metrics.log("\n===== FEATURE ENGINEERING PER CUSTOMER =====")
+    metrics.set("rows_input", len(df))
 
-    # Hitung total spending (Monetary)
-    df["TotalPrice"] = df["Quantity"] * df["Price"]
+    with metrics.operation("aggregate_rfm"):
+        # Hitung total spending (Monetary)
+        df["TotalPrice"] = df["Quantity"] * df["Price"]
 
-    # Tanggal referensi = transaksi terakhir
-    reference_date = df["InvoiceDate"].max()
+        # Tanggal referensi = transaksi terakhir
+        reference_date = df["InvoiceDate"].max()
 
-    # Hitung fitur per customer
-    fitur_customer = df.groupby("Customer_ID").agg({
-        "Invoice": "nunique",      # Frequency
-        "TotalPrice": "sum",       # Monetary
-        "InvoiceDate": "max"       # Last transaction
-    })
+        # Hitung fitur per customer
+        fitur_customer = df.groupby("Customer_ID").agg({
+            "Invoice": "nunique",      # Frequency
+            "TotalPrice": "sum",       # Monetary
+            "InvoiceDate": "max"       # Last transaction
+        })
 
-    fitur_customer.columns = ["Frequency", "Monetary", "Last_Transaction"]
+        fitur_customer.columns = ["Frequency", "Monetary", "Last_Transaction"]
 
-    # Hitung recency dalam hari
-    fitur_customer["Recency"] = (reference_date - fitur_customer["Last_Transaction"]).dt.days
+        # Hitung recency dalam hari
+        fitur_customer["Recency"] = (reference_date - fitur_customer["Last_Transaction"]).dt.days
 
-    # Hanya ambil fitur final RFM
-    fitur_customer = fitur_customer.drop(columns=["Last_Transaction"])
-    fitur_customer = fitur_customer[["Recency", "Frequency", "Monetary"]]
+        # Hanya ambil fitur final RFM
+        fitur_customer = fitur_customer.drop(columns=["Last_Transaction"])
+        fitur_customer = fitur_customer[["Recency", "Frequency", "Monetary"]]
 
-    print("\n▶ Contoh hasil feature engineering (RFM):")
-    print(fitur_customer.head())
+    metrics.set("customers_output", len(fitur_customer))
+    metrics.log(f"\n▶ {len(df)} baris transaksi → {len(fitur_customer)} customer")
 
-    print("\n📌 Insight awal:")
-    print("- Recency rendah → pelanggan masih aktif.")
-    print("- Frequency tinggi → pelanggan sering transaksi.")
-    print("- Monetary tinggi → pelanggan berpotensi menjadi VIP.")
+    metrics.log("\n▶ Contoh hasil feature engineering (RFM):", level=DIAGNOSTIC)
+    metrics.log(fitur_customer.head(), level=DIAGNOSTIC)
+
+    metrics.log("\n📌 Insight awal:", level=DIAGNOSTIC)
+    metrics.log("- Recency rendah → pelanggan masih aktif.", level=DIAGNOSTIC)
+    metrics.log("- Frequency tinggi → pelanggan sering transaksi.", level=DIAGNOSTIC)
+    metrics.log("- Monetary tinggi → pelanggan berpotensi menjadi VIP.", level=DIAGNOSTIC)
 
     return fitur_customer
 
@@ -102,7 +109,7 @@ if __name__ == "__main__":
     print("\n🚀 Menjalankan pipeline RFM...\n")
 
     # 1. Cleaning dataset
-    output_file = clean_data()
+    output_file = clean_data(sort_output=False)
     df_clean = pd.read_csv(output_file, parse_dates=["InvoiceDate"])
 
     # 2. Eksplorasi awal dataset
@@ -0,0 +1,239 @@
+import pandas as pd
+import numpy as np
+from sklearn.cluster import KMeans
+from scipy.optimize import linear_sum_assignment
+from scipy.spatial.distance import cdist
+
+# IMPORT dari file sebelumnya
+from clean_data import clean_data
+from feature_rfm import feature_engineering
+from normalize_feature import normalize_features
+
+RFM_COLUMNS = ["Recency_Days", "Total_Transactions", "Total_Spending"]
+
+
+# =====================================================
+# HUNGARIAN MATCHING (ID CLUSTER STABIL)
+# =====================================================
+def match_clusters(old_centroids: pd.DataFrame, new_centroids: np.ndarray) -> dict:
+    """
+    Cocokkan centroid baru ke ID cluster lama dengan Hungarian matching
+    (jarak Euclidean antar centroid). Cluster baru yang tidak mendapat
+    pasangan diberi ID baru setelah ID lama terbesar.
+
+    Return: dict {indeks centroid baru: ID cluster}
+    """
+    cost = cdist(new_centroids, old_centroids.to_numpy())
+    rows, cols = linear_sum_assignment(cost)
+
+    mapping = {int(r): int(old_centroids.index[c]) for r, c in zip(rows, cols)}
+    next_id = int(old_centroids.index.max()) + 1
+    for r in range(len(new_centroids)):
+        if r not in mapping:
+            mapping[r] = next_id
+            next_id += 1
+    return mapping
+
+
+# =====================================================
+# DETEKSI CUSTOMER YANG BERUBAH
+# =====================================================
+def estimate_recency_shift(fitur_customer: pd.DataFrame, previous_result: pd.DataFrame) -> int:
+    """
+    Recency dihitung dari InvoiceDate terakhir di dataset, jadi setiap ada
+    transaksi baru Recency SEMUA customer bergeser sama besar. Geseran ini
+    diestimasi dari customer yang Frequency & Monetary-nya tidak berubah
+    (median selisih Recency mereka, dibulatkan). Karena Recency dibulatkan ke
+    bawah per hari, geseran per customer bisa berbeda ±1 hari dari nilai ini.
+    """
+    common = fitur_customer.index.intersection(previous_result.index)
+    current = fitur_customer.loc[common]
+    previous = previous_result.loc[common]
+
+    same_fm = (
+        (current["Total_Transactions"] == previous["Total_Transactions"])
+        & (current["Total_Spending"] == previous["Total_Spending"])
+    )
+    if not same_fm.any():
+        return 0
+    diff = current.loc[same_fm, "Recency_Days"] - previous.loc[same_fm, "Recency_Days"]
+    return int(round(diff.median()))
+
+
+def detect_changed_customers(fitur_customer: pd.DataFrame, previous_result: pd.DataFrame,
+                             recency_shift: int = 0) -> pd.Series:
+    """
+    True untuk customer baru atau customer yang RFM-nya berubah dari hasil
+    clustering sebelumnya: Frequency / Monetary berbeda, atau Recency berbeda
+    lebih dari 1 hari dari Recency lama + `recency_shift` (toleransi pembulatan
+    hari, lihat estimate_recency_shift).
+    """
+    previous = previous_result.reindex(fitur_customer.index)[RFM_COLUMNS]
+    current = fitur_customer[RFM_COLUMNS]
+
+    is_new = previous.isna().any(axis=1)
+    fm_changed = (
+        (current["Total_Transactions"] != previous["Total_Transactions"])
+        | (current["Total_Spending"] != previous["Total_Spending"])
+    )
+    recency_changed = (current["Recency_Days"] - previous["Recency_Days"] - recency_shift).abs() > 1
+    return is_new | fm_changed | recency_changed
+
+
+# =====================================================
+# RE-CLUSTERING INKREMENTAL
+# =====================================================
+def incremental_kmeans_clustering(fitur_normalized, fitur_customer, previous_result, scaler,
+                                  optimal_k=None, max_iter=20):
+    """
+    Re-segmentasi inkremental berdasarkan hasil clustering sebelumnya
+    (mis. customer_cluster_result.csv):
+    - Centroid lama dihitung ulang di ruang normalisasi saat ini (warm start)
+    - Hanya customer yang RFM-nya berubah / customer baru yang di-assign ulang
+    - ID cluster tetap (warm start); Hungarian matching dipakai saat K berubah
+    - Laporan migrasi customer per segmen
+
+    Jika optimal_k berbeda dari jumlah cluster sebelumnya, K-Means di-fit
+    ulang dengan init dari centroid lama lalu ID dicocokkan dengan Hungarian.
+    Jalur ini meng-assign ulang SEMUA customer (full Lloyd's, bukan inkremental).
+
+    Return: (fitur_customer dengan kolom Cluster, centroid baru, tabel migrasi)
+    """
+    print("\n===== 🔁 RE-CLUSTERING INKREMENTAL =====\n")
+
+    previous_result = previous_result.copy()
+    previous_result.index = previous_result.index.astype(fitur_customer.index.dtype)
+    fitur_customer = fitur_customer.copy()
+
+    # 1. Koreksi geseran Recency akibat tanggal referensi yang baru
+    recency_shift = estimate_recency_shift(fitur_customer, previous_result)
+    previous_aligned = previous_result[RFM_COLUMNS].copy()
+    previous_aligned["Recency_Days"] += recency_shift
+    print(f"▶ Geseran Recency (tanggal referensi baru): {recency_shift} hari")
+
+    # 2. Centroid lama di ruang normalisasi saat ini
+    prev_scaled = pd.DataFrame(
+        scaler.transform(previous_aligned),
+        index=previous_result.index,
+        columns=RFM_COLUMNS
+    )
+    old_centroids = prev_scaled.groupby(previous_result["Cluster"]).mean()
+    previous_k = len(old_centroids)
+
+    changed = detect_changed_customers(fitur_customer, previous_result, recency_shift)
+    print(f"▶ Customer berubah / baru : {changed.sum()} dari {len(changed)}")
+
+    X = fitur_normalized[RFM_COLUMNS].to_numpy()
+
+    if optimal_k is not None and optimal_k != previous_k:
+        # 3a. Jumlah cluster berubah → refit warm start (semua customer) + Hungarian matching
+        print(f"⚠ Jumlah cluster berubah ({previous_k} → {optimal_k}), refit semua customer dengan warm start.")
+        init = old_centroids.to_numpy()
+        if optimal_k < previous_k:
+            # Seed dari cluster lama terbesar, bukan dari urutan ID
+            sizes = previous_result["Cluster"].value_counts().reindex(old_centroids.index).to_numpy()
+            init = init[np.sort(np.argsort(-sizes, kind="stable")[:optimal_k])]
+        else:
+            rng = np.random.default_rng(42)
+            extra = X[rng.choice(len(X), optimal_k - previous_k, replace=False)]
+            init = np.vstack([init, extra])
+
+        kmeans = KMeans(n_clusters=optimal_k, init=init, n_init=1, random_state=42)
+        raw_labels = kmeans.fit_predict(X)
+        mapping = match_clusters(old_centroids, kmeans.cluster_centers_)
+        labels = pd.Series(raw_labels, index=fitur_customer.index).map(mapping)
+        centroids = pd.DataFrame(kmeans.cluster_centers_, columns=RFM_COLUMNS)
+        centroids.index = [mapping[i] for i in range(optimal_k)]
+    else:
+        # 3b. Label lama dipertahankan, hanya customer berubah yang di-assign ulang
+        labels = previous_result["Cluster"].reindex(fitur_customer.index)
+        stable = ~changed.to_numpy()
+        X_changed = X[changed.to_numpy()]
+
+        cluster_ids = old_centroids.index.to_numpy()
+        stable_labels = labels[stable].to_numpy()
+        stable_group = pd.DataFrame(X[stable]).groupby(stable_labels)
+        stable_sum = stable_group.sum().reindex(cluster_ids, fill_value=0).to_numpy()
+        stable_count = stable_group.size().reindex(cluster_ids, fill_value=0).to_numpy(dtype=float)
+
+        centroids_arr = old_centroids.to_numpy().copy()
+        changed_idx = np.zeros(len(X_changed), dtype=int)
+        for iteration in range(max_iter):
+            new_idx = cdist(X_changed, centroids_arr).argmin(axis=1)
+            if iteration > 0 and np.array_equal(new_idx, changed_idx):
+                break
+            changed_idx = new_idx
+
+            # Update centroid: kontribusi customer stabil + customer berubah
+            total_sum = stable_sum.copy()
+            total_count = stable_count.copy()
+            np.add.at(total_sum, changed_idx, X_changed)
+            np.add.at(total_count, changed_idx, 1)
+            non_empty = total_count > 0
+            centroids_arr[non_empty] = total_sum[non_empty] / total_count[non_empty, None]
+
+        labels[changed] = cluster_ids[changed_idx]
+        labels = labels.astype(int)
+
+        # ID sudah stabil (tiap centroid berasal dari centroid lama ber-ID sama);
+        # Hungarian hanya dipakai untuk peringatan jika centroid bergeser jauh
+        mapping = match_clusters(old_centroids, centroids_arr)
+        if any(mapping[i] != cluster_ids[i] for i in range(len(cluster_ids))):
+            print("⚠ Centroid bergeser jauh dari posisi lama; pertimbangkan refit penuh.")
+        centroids = pd.DataFrame(centroids_arr, index=cluster_ids, columns=RFM_COLUMNS)
+
+    fitur_customer["Cluster"] = labels
+
+    # 4. Laporan migrasi per segmen
+    prev_labels = previous_result["Cluster"].reindex(fitur_customer.index)
+    migration = pd.crosstab(
+        prev_labels.map(lambda c: "Baru" if pd.isna(c) else str(int(c))).rename("Cluster_Lama"),
+        labels.rename("Cluster_Baru")
+    )
+    hilang = previous_result.index.difference(fitur_customer.index)
+    if len(hilang) > 0:
+        print(f"▶ Customer tidak muncul lagi : {len(hilang)}")
+
+    print("\n📦 Migrasi customer antar segmen (baris = lama, kolom = baru):")
+    print(migration)
+
+    print("\n📍 Centroid baru (ruang normalisasi):")
+    print(centroids.sort_index())
+
+    return fitur_customer, centroids.sort_index(), migration
+
+
+# =====================================================
+# MAIN RUN
+# =====================================================
+if __name__ == "__main__":
+    print("\n🚀 INCREMENTAL RE-SEGMENTATION...\n")
+
+    # 1. Cleaning data
+    output_file = clean_data(sort_output=False)
+    df_clean = pd.read_csv(output_file, parse_dates=["InvoiceDate"])
+
+    # 2. Feature engineering
+    fitur_customer = feature_engineering(df_clean)
+    fitur_customer = fitur_customer.rename(columns={
+        "Recency": "Recency_Days",
+        "Frequency": "Total_Transactions",
+        "Monetary": "Total_Spending"
+    })
+
+    # 3. Normalisasi
+    fitur_normalized, scaler = normalize_features(fitur_customer)
+
+    # 4. Hasil clustering sebelumnya
+    previous_result = pd.read_csv("customer_cluster_result.csv", index_col="Customer_ID")
+
+    # 5. Re-clustering inkremental (K sama dengan run sebelumnya)
+    fitur_hasil_cluster, centroids, migration = incremental_kmeans_clustering(
+        fitur_normalized, fitur_customer, previous_result, scaler
+    )
+
+    # 6. Simpan hasil
+    fitur_hasil_cluster.to_csv("customer_cluster_result.csv", index=True)
+    migration.to_csv("segment_migration.csv")
+    print("\n📁 Hasil clustering disimpan ke: customer_cluster_result.csv")
+    print("📁 Migrasi segmen disimpan ke: segment_migration.csv")
@@ -0,0 +1,243 @@
+import cProfile
+import functools
+import io
+import json
+import numbers
+import os
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# =====================================================
+# LEVEL VERBOSITY
+# =====================================================
+# SILENT     : tidak ada print, hanya metrik terstruktur
+# SUMMARY    : ringkasan per tahap (jumlah baris, waktu)
+# DIAGNOSTIC : semua laporan EDA (describe, outlier, dll.) — perilaku lama
+SILENT, SUMMARY, DIAGNOSTIC = 0, 1, 2
+
+# Bisa diatur lewat environment, mis.:
+#   SEGMENTASI_VERBOSITY=1 SEGMENTASI_PROFILE=clean_data SEGMENTASI_TRACEMALLOC=clean_data,feature_engineering
+DEFAULT_VERBOSITY = int(os.environ.get("SEGMENTASI_VERBOSITY", DIAGNOSTIC))
+PROFILE_STAGES = {s for s in os.environ.get("SEGMENTASI_PROFILE", "").split(",") if s}
+TRACEMALLOC_STAGES = {s for s in os.environ.get("SEGMENTASI_TRACEMALLOC", "").split(",") if s}
+
+# Semua tahap yang sudah selesai pada proses ini (untuk export_metrics);
+# panggil reset_metrics() sebelum run baru agar tahap lama tidak ikut terekspor
+COMPLETED_STAGES = []
+
+
+def reset_metrics():
+    """Kosongkan COMPLETED_STAGES, mis. sebelum menjalankan pipeline lagi di proses yang sama."""
+    COMPLETED_STAGES.clear()
+
+
+def _current_rss_bytes():
+    """RSS proses saat ini dari /proc (Linux); None jika tidak tersedia."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+# =====================================================
+# METRIK PER TAHAP
+# =====================================================
+class StageMetrics:
+    """
+    Pengumpul metrik untuk satu tahap pipeline: jumlah baris masuk/keluar per
+    filter, waktu per operasi, delta memori, dan nilai ringkasan lainnya.
+    Dipakai sebagai context manager; cProfile/tracemalloc opsional per tahap.
+    """
+
+    def __init__(self, stage: str, verbosity: int = None, profile: bool = None, trace_memory: bool = None):
+        self.stage = stage
+        self.verbosity = DEFAULT_VERBOSITY if verbosity is None else verbosity
+        self.profile = stage in PROFILE_STAGES if profile is None else profile
+        self.trace_memory = stage in TRACEMALLOC_STAGES if trace_memory is None else trace_memory
+
+        self.operations = {}
+        self.filters = {}
+        self.values = {}
+        self.seconds = None
+        self.memory_delta_bytes = None
+        self.profile_report = None
+
+        self._profiler = None
+        self._started_tracemalloc = False
+
+    @property
+    def diagnostics(self) -> bool:
+        """True jika perhitungan yang hanya untuk laporan boleh dijalankan."""
+        return self.verbosity >= DIAGNOSTIC
+
+    def log(self, *args, level: int = SUMMARY):
+        if self.verbosity >= level:
+            print(*args)
+
+    # ---------- pengukuran ----------
+    def _memory_now(self):
+        # Memori terpakai saat ini (bisa turun), bukan puncak: tracemalloc jika
+        # aktif, selain itu RSS dari /proc; di luar Linux tanpa tracemalloc → None
+        if tracemalloc.is_tracing():
+            return tracemalloc.get_traced_memory()[0]
+        return _current_rss_bytes()
+
+    @contextmanager
+    def operation(self, name: str):
+        """Ukur waktu dan delta memori satu operasi di dalam tahap ini."""
+        mem_before = self._memory_now()
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record = {"seconds": time.perf_counter() - start}
+            mem_after = self._memory_now()
+            if mem_before is not None and mem_after is not None:
+                record["memory_delta_bytes"] = mem_after - mem_before
+            if tracemalloc.is_tracing():
+                record["memory_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            self.operations[name] = record
+
+    def filter(self, name: str, before, after):
+        """Catat jumlah baris sebelum/sesudah filter, lalu kembalikan `after`."""
+        self.filters[name] = {"rows_in": len(before), "rows_out": len(after)}
+        return after
+
+    def set(self, name: str, value):
+        if hasattr(value, "item"):  # skalar numpy → tipe Python (aman untuk JSON)
+            value = value.item()
+        self.values[name] = value
+
+    # ---------- context manager ----------
+    def __enter__(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        if self.profile:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        self._mem_start = self._memory_now()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.seconds = time.perf_counter() - self._start
+        mem_end = self._memory_now()
+        if self._mem_start is not None and mem_end is not None:
+            self.memory_delta_bytes = mem_end - self._mem_start
+
+        if self._profiler is not None:
+            self._profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(15)
+            self.profile_report = out.getvalue()
+            self.log(f"\n⏱ cProfile tahap '{self.stage}':\n{self.profile_report}")
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+        COMPLETED_STAGES.append(self)
+        self.log(f"\n⏱ Tahap '{self.stage}' selesai dalam {self.seconds:.2f} detik")
+        return False
+
+    # ---------- export ----------
+    def to_dict(self) -> dict:
+        return {
+            "stage": self.stage,
+            "seconds": self.seconds,
+            "memory_delta_bytes": self.memory_delta_bytes,
+            "operations": self.operations,
+            "filters": self.filters,
+            "values": self.values,
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2, default=str)
+
+
+def instrumented_stage(stage: str):
+    """
+    Decorator tahap pipeline: fungsi menerima argumen `metrics` (StageMetrics);
+    jika tidak diberikan, dibuat otomatis dengan setting default/environment.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, metrics: StageMetrics = None, **kwargs):
+            metrics = metrics or StageMetrics(stage)
+            with metrics:
+                return func(*args, metrics=metrics, **kwargs)
+        return wrapper
+    return decorator
+
+
+# =====================================================
+# EXPORT (JSON / OpenMetrics)
+# =====================================================
+def _label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def to_openmetrics(stages=None) -> str:
+    """Format OpenMetrics text untuk semua tahap (default: COMPLETED_STAGES)."""
+    stages = COMPLETED_STAGES if stages is None else stages
+    families = {
+        "segmentasi_stage_seconds": [],
+        "segmentasi_stage_memory_delta_bytes": [],
+        "segmentasi_operation_seconds": [],
+        "segmentasi_operation_memory_delta_bytes": [],
+        "segmentasi_operation_memory_peak_bytes": [],
+        "segmentasi_filter_rows_in": [],
+        "segmentasi_filter_rows_out": [],
+        "segmentasi_stage_value": [],
+    }
+
+    for m in stages:
+        stage = f'stage="{_label(m.stage)}"'
+        if m.seconds is not None:
+            families["segmentasi_stage_seconds"].append(f"{{{stage}}} {m.seconds}")
+        if m.memory_delta_bytes is not None:
+            families["segmentasi_stage_memory_delta_bytes"].append(f"{{{stage}}} {m.memory_delta_bytes}")
+        for name, rec in m.operations.items():
+            labels = f'{{{stage},operation="{_label(name)}"}}'
+            families["segmentasi_operation_seconds"].append(f"{labels} {rec['seconds']}")
+            if "memory_delta_bytes" in rec:
+                families["segmentasi_operation_memory_delta_bytes"].append(f"{labels} {rec['memory_delta_bytes']}")
+            if "memory_peak_bytes" in rec:
+                families["segmentasi_operation_memory_peak_bytes"].append(f"{labels} {rec['memory_peak_bytes']}")
+        for name, rec in m.filters.items():
+            labels = f'{{{stage},filter="{_label(name)}"}}'
+            families["segmentasi_filter_rows_in"].append(f"{labels} {rec['rows_in']}")
+            families["segmentasi_filter_rows_out"].append(f"{labels} {rec['rows_out']}")
+        for name, value in m.values.items():
+            if isinstance(value, numbers.Real) and not isinstance(value, bool):
+                labels = f'{{{stage},name="{_label(name)}"}}'
+                families["segmentasi_stage_value"].append(f"{labels} {value}")
+
+    lines = []
+    for family, samples in families.items():
+        if not samples:
+            continue
+        lines.append(f"# TYPE {family} gauge")
+        lines.extend(f"{family}{sample}" for sample in samples)
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def export_metrics(path: str = "pipeline_metrics.json", stages=None, fmt: str = "json") -> str:
+    """Simpan metrik tahap ke file JSON atau OpenMetrics text."""
+    stages = COMPLETED_STAGES if stages is None else stages
+    if fmt == "json":
+        content = json.dumps([m.to_dict() for m in stages], indent=2, default=str)
+    elif fmt == "openmetrics":
+        content = to_openmetrics(stages)
+    else:
+        raise ValueError(f"❌ Format metrik tidak dikenal: {fmt} (pilih 'json' atau 'openmetrics')")
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    return path
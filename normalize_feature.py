@@ -6,30 +6,34 @@ from clean_data import clean_data
 from exploration import explore_clean_data
 from feature_rfm import feature_engineering
 from eda_feature_engineering import eda_feature_engineering  
+from instrumentation import StageMetrics, instrumented_stage, export_metrics, reset_metrics, DIAGNOSTIC
 
 # =====================================================
 # NORMALISASI DATA (StandardScaler)
 # =====================================================
-def normalize_features(fitur_customer: pd.DataFrame):
-    print("\n===== NORMALISASI DATA (StandardScaler) =====\n")
+@instrumented_stage("normalize_features")
+def normalize_features(fitur_customer: pd.DataFrame, metrics: StageMetrics = None):
+    metrics.log("\n===== NORMALISASI DATA (StandardScaler) =====\n")
+    metrics.set("rows_input", len(fitur_customer))
 
-    scaler = StandardScaler()
-    fitur_normalized = scaler.fit_transform(fitur_customer)
+    with metrics.operation("standard_scaler"):
+        scaler = StandardScaler()
+        fitur_normalized = scaler.fit_transform(fitur_customer)
 
-    fitur_normalized = pd.DataFrame(
-        fitur_normalized,
-        index=fitur_customer.index,
-        columns=fitur_customer.columns
-    )
+        fitur_normalized = pd.DataFrame(
+            fitur_normalized,
+            index=fitur_customer.index,
+            columns=fitur_customer.columns
+        )
 
-    print("📊 Contoh sebelum normalisasi:")
-    print(fitur_customer.head())
+    metrics.log("📊 Contoh sebelum normalisasi:", level=DIAGNOSTIC)
+    metrics.log(fitur_customer.head(), level=DIAGNOSTIC)
 
-    print("\n📈 Contoh setelah normalisasi:")
-    print(fitur_normalized.head())
+    metrics.log("\n📈 Contoh setelah normalisasi:", level=DIAGNOSTIC)
+    metrics.log(fitur_normalized.head(), level=DIAGNOSTIC)
 
-    print("\n✔ Normalisasi selesai — data siap digunakan untuk clustering (K-Means).")
-    print("⚠ Pastikan tidak ada outlier ekstrim sebelum clustering.")
+    metrics.log("\n✔ Normalisasi selesai — data siap digunakan untuk clustering (K-Means).")
+    metrics.log("⚠ Pastikan tidak ada outlier ekstrim sebelum clustering.")
 
     return fitur_normalized, scaler
 
@@ -38,9 +42,10 @@ def normalize_features(fitur_customer: pd.DataFrame):
 # =====================================================
 if __name__ == "__main__":
     print("\n🚀 Menjalankan FULL PIPELINE (Cleaning → EDA → RFM → Normalisasi)...\n")
+    reset_metrics()
 
     # 1. Cleaning data
-    output_file = clean_data()
+    output_file = clean_data(sort_output=False)
     df_clean = pd.read_csv(output_file, parse_dates=["InvoiceDate"])
 
     # 2. Eksplorasi awal dataset
@@ -66,4 +71,9 @@ if __name__ == "__main__":
     fitur_normalized.to_csv("feature_normalized.csv")
     print("\n📁 Fitur hasil normalisasi disimpan ke: feature_normalized.csv")
 
+    # 7. Simpan metrik tiap tahap (JSON + OpenMetrics)
+    export_metrics("pipeline_metrics.json")
+    export_metrics("pipeline_metrics.prom", fmt="openmetrics")
+    print("📁 Metrik pipeline disimpan ke: pipeline_metrics.json, pipeline_metrics.prom")
+
     print("\n🧠 Pipeline selesai — tinggal lanjut ke CLUSTERING (K-Means).")
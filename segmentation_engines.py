@@ -0,0 +1,279 @@
+import tracemalloc
+from abc import ABC, abstractmethod
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans, Birch
+from sklearn.mixture import GaussianMixture
+from sklearn.metrics import silhouette_score, davies_bouldin_score, calinski_harabasz_score
+
+from coreset import build_coreset
+from instrumentation import StageMetrics
+
+
+# =====================================================
+# INTERFACE ENGINE SEGMENTASI
+# =====================================================
+class SegmentationEngine(ABC):
+    """
+    Interface umum engine segmentasi. Setelah fit(X) tersedia:
+    labels_, cluster_centers_ (rata-rata per segmen) dan inertia_.
+    Engine yang bisa menghasilkan segmen lebih sedikit dari n_clusters
+    mengisi n_segments_ di _fit.
+    """
+    name = "base"
+
+    def __init__(self, n_clusters: int, random_state: int = 42):
+        self.n_clusters = n_clusters
+        self.random_state = random_state
+
+    @abstractmethod
+    def _fit(self, X: np.ndarray):
+        ...
+
+    @abstractmethod
+    def predict(self, X) -> np.ndarray:
+        ...
+
+    def fit(self, X):
+        X = np.asarray(X, dtype=float)
+        for attr in ("cluster_centers_", "inertia_", "n_segments_"):
+            self.__dict__.pop(attr, None)
+        self._fit(X)
+        self.labels_ = self.predict(X)
+        if not hasattr(self, "cluster_centers_"):
+            n_segments = getattr(self, "n_segments_", self.n_clusters)
+            self.cluster_centers_ = np.vstack([
+                X[self.labels_ == c].mean(axis=0) if (self.labels_ == c).any() else np.full(X.shape[1], np.nan)
+                for c in range(n_segments)
+            ])
+        if not hasattr(self, "inertia_"):
+            centers = np.nan_to_num(self.cluster_centers_)
+            self.inertia_ = float(((X - centers[self.labels_]) ** 2).sum())
+        return self
+
+    def fit_predict(self, X) -> np.ndarray:
+        return self.fit(X).labels_
+
+
+class KMeansEngine(SegmentationEngine):
+    """K-Means standar (perilaku lama project)."""
+    name = "kmeans"
+
+    def _fit(self, X):
+        self.model = KMeans(n_clusters=self.n_clusters, random_state=self.random_state)
+        self.model.fit(X)
+        self.cluster_centers_ = self.model.cluster_centers_
+        self.inertia_ = self.model.inertia_
+
+    def predict(self, X):
+        return self.model.predict(np.asarray(X, dtype=float))
+
+
+class GaussianMixtureCoresetEngine(SegmentationEngine):
+    """
+    Gaussian Mixture (covariance full, cocok untuk fitur RFM yang skew)
+    di-fit pada coreset berbobot, lalu dipakai untuk memprediksi data penuh.
+    GaussianMixture tidak menerima sample_weight, jadi coreset di-resample
+    sebanding bobotnya sebelum EM (coreset mentah terlalu banyak berisi titik
+    ekstrem). Inisialisasi: K-Means berbobot di coreset → means_init & weights_init.
+    Komponen yang kosong di data penuh mendapat centroid NaN (lihat base class).
+    """
+    name = "gmm_coreset"
+
+    def __init__(self, n_clusters: int, random_state: int = 42, coreset_size: int = 2000):
+        super().__init__(n_clusters, random_state)
+        self.coreset_size = coreset_size
+
+    def _fit(self, X):
+        points, weights, _ = build_coreset(X, self.coreset_size, self.random_state)
+
+        init = KMeans(n_clusters=self.n_clusters, random_state=self.random_state)
+        init.fit(points, sample_weight=weights)
+        mass = np.bincount(init.labels_, weights=weights, minlength=self.n_clusters)
+
+        self.model = GaussianMixture(
+            n_components=self.n_clusters,
+            covariance_type="full",
+            means_init=init.cluster_centers_,
+            weights_init=mass / mass.sum(),
+            reg_covar=1e-4,
+            random_state=self.random_state,
+        )
+        # Resample ∝ bobot → distribusi mendekati data penuh untuk EM
+        rng = np.random.default_rng(self.random_state)
+        resampled = points[rng.choice(len(points), size=len(points), replace=True, p=weights / weights.sum())]
+        self.model.fit(resampled)
+
+    def predict(self, X):
+        return self.model.predict(np.asarray(X, dtype=float))
+
+
+class BirchEngine(SegmentationEngine):
+    """
+    BIRCH: satu pass streaming (partial_fit per batch) membangun CF-tree,
+    lalu global clustering ke n_clusters hanya dilakukan sekali di akhir.
+    """
+    name = "birch"
+
+    def __init__(self, n_clusters: int, random_state: int = 42, threshold: float = 0.5, batch_size: int = 10_000):
+        super().__init__(n_clusters, random_state)
+        self.threshold = threshold
+        self.batch_size = batch_size
+
+    def _fit(self, X):
+        self.model = Birch(threshold=self.threshold, n_clusters=None)
+        for start in range(0, len(X), self.batch_size):
+            self.model.partial_fit(X[start:start + self.batch_size])
+
+        # Global clustering subcluster → n_clusters (tanpa membaca data lagi)
+        self.model.set_params(n_clusters=self.n_clusters)
+        self.model.partial_fit()
+
+    def predict(self, X):
+        return self.model.predict(np.asarray(X, dtype=float))
+
+
+class RFMQuantileEngine(SegmentationEngine):
+    """
+    Skor RFM berbasis kuantil, tanpa fitting iteratif:
+    tiap fitur dibagi ke n_bins kuantil (skor 1..n_bins, Recency dibalik),
+    total skor lalu dibagi ke n_clusters segmen berdasarkan kuantil.
+    Urutan kolom diasumsikan [Recency, Frequency, Monetary].
+    """
+    name = "rfm_quantile"
+
+    def __init__(self, n_clusters: int, random_state: int = 42, n_bins: int = 5,
+                 higher_is_better=(False, True, True)):
+        super().__init__(n_clusters, random_state)
+        self.n_bins = n_bins
+        self.higher_is_better = higher_is_better
+
+    def _score(self, X):
+        score = np.zeros(len(X))
+        for j, (edges, better) in enumerate(zip(self.feature_edges_, self.higher_is_better)):
+            bins = np.searchsorted(edges, X[:, j], side="right") + 1  # 1..n_bins
+            score += bins if better else (len(edges) + 2 - bins)
+        return score
+
+    def _fit(self, X):
+        inner = np.linspace(0, 1, self.n_bins + 1)[1:-1]
+        self.feature_edges_ = [np.unique(np.quantile(X[:, j], inner)) for j in range(X.shape[1])]
+
+        score = self._score(X)
+        inner_k = np.linspace(0, 1, self.n_clusters + 1)[1:-1]
+        self.score_edges_ = np.unique(np.quantile(score, inner_k))
+        # Kuantil yang kembar (banyak skor sama) mengurangi jumlah segmen efektif
+        self.n_segments_ = len(self.score_edges_) + 1
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=float)
+        return np.searchsorted(self.score_edges_, self._score(X), side="right")
+
+
+ENGINES = {
+    engine.name: engine
+    for engine in (KMeansEngine, GaussianMixtureCoresetEngine, BirchEngine, RFMQuantileEngine)
+}
+
+
+def make_engine(name: str, n_clusters: int, **kwargs) -> SegmentationEngine:
+    if name not in ENGINES:
+        raise ValueError(f"❌ Engine tidak dikenal: {name} (pilih salah satu: {list(ENGINES)})")
+    return ENGINES[name](n_clusters=n_clusters, **kwargs)
+
+
+# =====================================================
+# PERBANDINGAN ENGINE (WAKTU, MEMORI, KUALITAS)
+# =====================================================
+def _peak_memory_bytes(func) -> int:
+    """Puncak alokasi (tracemalloc) selama func() — dijalankan terpisah dari pengukuran waktu."""
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    try:
+        func()
+    finally:
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+        if started:
+            tracemalloc.stop()
+    return peak
+
+
+def compare_engines(fitur_normalized, n_clusters: int, engines=None, quality_sample_size: int = 5000,
+                    metrics: StageMetrics = None) -> pd.DataFrame:
+    """
+    Fit setiap engine dan laporkan waktu fit, puncak memori serta metrik
+    kualitas dan ukuran segmen. Waktu diukur tanpa tracemalloc (kecuali
+    `metrics` yang diberikan pemanggil mengaktifkannya); puncak memori diukur
+    pada fit kedua. Silhouette dihitung pada sampel agar tidak O(n²).
+    """
+    engines = list(ENGINES) if engines is None else engines
+    # trace_memory=False: tracemalloc memperlambat fit dan merusak ranking waktu
+    metrics = metrics or StageMetrics("compare_engines", trace_memory=False)
+    X = np.asarray(fitur_normalized, dtype=float)
+
+    metrics.log(f"\n===== ⚖ PERBANDINGAN ENGINE SEGMENTASI (K = {n_clusters}, n = {len(X)}) =====\n")
+
+    rows = []
+    with metrics:
+        for name in engines:
+            engine = make_engine(name, n_clusters)
+            with metrics.operation(name):
+                labels = engine.fit_predict(X)
+            peak = _peak_memory_bytes(lambda: make_engine(name, n_clusters).fit(X))
+            metrics.set(f"{name}_memory_peak_bytes", peak)
+
+            sizes = np.bincount(labels)
+            sizes = sizes[sizes > 0]
+            row = {
+                "engine": name,
+                "fit_seconds": metrics.operations[name]["seconds"],
+                "memory_peak_mb": peak / 1e6,
+                "n_segments": len(sizes),
+                "min_segment_share": sizes.min() / len(X),
+                "inertia": engine.inertia_,
+                "silhouette": np.nan,
+                "davies_bouldin": np.nan,
+                "calinski_harabasz": np.nan,
+            }
+            if len(sizes) > 1:
+                row["silhouette"] = silhouette_score(
+                    X, labels, sample_size=min(len(X), quality_sample_size), random_state=42
+                )
+                row["davies_bouldin"] = davies_bouldin_score(X, labels)
+                row["calinski_harabasz"] = calinski_harabasz_score(X, labels)
+            rows.append(row)
+
+    report = pd.DataFrame(rows).set_index("engine")
+    report["n_clusters"] = n_clusters
+    metrics.log(report.round(4))
+    return report
+
+
+def recommend_engine(report: pd.DataFrame, tolerance: float = 0.9, min_segment_share: float = 0.01,
+                     fallback: str = "kmeans") -> str:
+    """
+    Pilih engine tercepat yang kualitasnya memadai:
+    1. Buang hasil degenerate: jumlah segmen != K atau ada segmen lebih kecil
+       dari `min_segment_share` (mis. BIRCH yang hanya mengisolasi outlier).
+    2. Silhouette >= tolerance × terbaik DAN Davies-Bouldin <= terbaik / tolerance.
+    Jika tidak ada kandidat, kembali ke `fallback`.
+    """
+    valid = report[
+        (report["n_segments"] == report["n_clusters"])
+        & (report["min_segment_share"] >= min_segment_share)
+    ].dropna(subset=["silhouette", "davies_bouldin"])
+    if valid.empty:
+        print(f"⚠ Tidak ada engine yang lolos cek segmen, pakai '{fallback}'.")
+        return fallback
+
+    adequate = valid[
+        (valid["silhouette"] >= tolerance * valid["silhouette"].max())
+        & (valid["davies_bouldin"] <= valid["davies_bouldin"].min() / tolerance)
+    ]
+    if adequate.empty:
+        return fallback
+    return adequate["fit_seconds"].idxmin()